@@ -11,15 +11,19 @@ PRIVACY GUARANTEES:
 - No sharing or export functionality
 """
 
+import asyncio
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
 from contextlib import asynccontextmanager
-from typing import List
-from fastapi import FastAPI, UploadFile, File, HTTPException
+from typing import List, Optional
+from fastapi import FastAPI, UploadFile, File, HTTPException, Response
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import StreamingResponse
-import io
+from fastapi.responses import ORJSONResponse, StreamingResponse
+import msgspec
 
 from models import (
-    UploadResponse, PagesResponse, PageText,
+    UploadResponse, PagesResponse,
     TranslateRequest, TranslateResponse,
     SummaryRequest, SummaryResponse,
     CharactersRequest, CharactersResponse, Character,
@@ -28,27 +32,45 @@ from models import (
 )
 from services import (
     session_manager,
-    extract_text_from_image, validate_image,
-    translate_to_telugu,
-    generate_summary,
+    extract_text_with_confidence,
+    validate_upload_file,
+    translate_to_telugu, translate_to_telugu_stream, translate_batch_to_telugu,
+    generate_summary, generate_summary_stream,
     extract_characters,
-    generate_speech,
-    correct_ocr_text
+    generate_speech_stream,
+    generate_speech_openai_stream,
+    warm_tts_session,
+    TTS_PROVIDER,
+    correct_ocr_text_batch
 )
 
 # Maximum pages per session
 MAX_PAGES = 15
 
+# Mean Tesseract word confidence (0-100) above which a page is
+# considered clean enough to skip AI correction
+OCR_CONFIDENCE_THRESHOLD = 80.0
+
+# Process pool for CPU-bound OCR work (created in lifespan)
+ocr_pool: Optional[ProcessPoolExecutor] = None
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Manage application lifecycle - start/stop background tasks"""
-    # Startup: begin session cleanup task
+    global ocr_pool
+    # Startup: begin session cleanup task and OCR worker pool
     await session_manager.start_cleanup_task()
+    ocr_pool = ProcessPoolExecutor(max_workers=os.cpu_count())
+    # Fire-and-forget: open the TLS connection to Google so the first
+    # /tts request skips the handshake
+    asyncio.get_running_loop().run_in_executor(None, warm_tts_session)
     print("[Server] Started session cleanup background task")
     yield
-    # Shutdown: stop cleanup task
+    # Shutdown: stop cleanup task and OCR worker pool
     await session_manager.stop_cleanup_task()
+    ocr_pool.shutdown(wait=False, cancel_futures=True)
+    ocr_pool = None
     print("[Server] Stopped session cleanup background task")
 
 
@@ -57,7 +79,8 @@ app = FastAPI(
     title="Personal AI Reading Companion",
     description="Private reading assistant with OCR, translation, TTS, and summarization",
     version="1.0.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse  # SIMD-accelerated JSON encoding
 )
 
 # Configure CORS for frontend
@@ -96,33 +119,54 @@ async def upload_images(files: List[UploadFile] = File(...)):
     
     # Create new session
     session_id = session_manager.create_session()
-    
-    # Process each image
-    for idx, file in enumerate(files, start=1):
-        # Read file into memory
-        image_bytes = await file.read()
-        
-        # Validate image
-        is_valid, error_msg = validate_image(image_bytes)
+
+    # Validate every upload first via header-only sniff on the spooled
+    # file - no page body is buffered before all files pass
+    for file in files:
+        is_valid, error_msg = validate_upload_file(file.file)
         if not is_valid:
             # Clean up session on error
             session_manager.delete_session(session_id)
             raise HTTPException(status_code=400, detail=f"File {file.filename}: {error_msg}")
-        
-        # Extract text using OCR
-        text = extract_text_from_image(image_bytes)
+
+    # Read and dispatch OCR with a semaphore sized to the worker pool,
+    # so at most pool-width page payloads are resident at once instead
+    # of the whole upload (the process pool needs picklable bytes, so
+    # the spooled handle itself cannot cross). TaskGroup gives
+    # structured error propagation: one failed page cancels the rest
+    # instead of leaving orphaned pool work.
+    loop = asyncio.get_running_loop()
+    gate = asyncio.Semaphore(os.cpu_count() or 1)
+
+    async def ocr_one(upload: UploadFile):
+        async with gate:
+            image_bytes = await upload.read()
+            return await loop.run_in_executor(
+                ocr_pool, extract_text_with_confidence, image_bytes
+            )
+
+    async with asyncio.TaskGroup() as tg:
+        tasks = [tg.create_task(ocr_one(file)) for file in files]
+
+    results = [t.result() for t in tasks]
+
+    # Apply AI-powered text correction only to low-confidence pages,
+    # all in one batched call - clean scans skip the LLM entirely
+    needs_correction = [
+        text for text, conf in results
+        if text is not None and conf < OCR_CONFIDENCE_THRESHOLD
+    ]
+    corrected = await correct_ocr_text_batch(needs_correction)
+    corrected_iter = iter(corrected)
+
+    # Store in session (in-memory only)
+    for idx, (text, conf) in enumerate(results, start=1):
         if text is None:
             text = "[Unable to extract text from this page]"
-        else:
-            # Apply AI-powered text correction to fix OCR errors
-            text = await correct_ocr_text(text)
-        
-        # Store in session (in-memory only)
+        elif conf < OCR_CONFIDENCE_THRESHOLD:
+            text = next(corrected_iter)
         session_manager.add_page(session_id, idx, text)
-        
-        # Clear image from memory
-        del image_bytes
-    
+
     return UploadResponse(
         session_id=session_id,
         page_count=len(files),
@@ -136,13 +180,15 @@ async def get_pages(session_id: str):
     Get extracted text for all pages in a session.
     """
     pages = session_manager.get_pages(session_id)
-    
+
     if pages is None:
         raise HTTPException(status_code=404, detail="Session not found or expired")
-    
-    return PagesResponse(
-        session_id=session_id,
-        pages=[PageText(page_number=p["page_number"], text=p["text"]) for p in pages]
+
+    # Largest payload in the API (15 pages of text): encode with
+    # msgspec directly, skipping per-field Pydantic model construction
+    return Response(
+        msgspec.json.encode({"session_id": session_id, "pages": pages}),
+        media_type="application/json"
     )
 
 
@@ -156,28 +202,48 @@ async def translate_page(request: TranslateRequest):
     if not session:
         raise HTTPException(status_code=404, detail="Session not found or expired")
     
+    # Find the page (O(1) index lookup)
+    english_text = session_manager.get_page_text(request.session_id, request.page_number)
+
+    if english_text is None:
+        raise HTTPException(status_code=404, detail=f"Page {request.page_number} not found")
+
     # Check for cached translation
     cached = session_manager.get_translation(request.session_id, request.page_number)
+
+    # Stream translation chunks as SSE so the first words arrive
+    # without waiting for the full generation
+    if request.stream:
+        async def stream_translation():
+            if cached:
+                yield f"data: {json.dumps(cached)}\n\n"
+                yield "data: [DONE]\n\n"
+                return
+            parts = []
+            completed = False
+            try:
+                async for chunk in translate_to_telugu_stream(english_text):
+                    parts.append(chunk)
+                    yield f"data: {json.dumps(chunk)}\n\n"
+                completed = True
+                yield "data: [DONE]\n\n"
+            finally:
+                # Cache only complete translations - a disconnect here
+                # would otherwise pin truncated text for the session
+                if completed and parts:
+                    session_manager.add_translation(
+                        request.session_id, request.page_number, "".join(parts).strip()
+                    )
+
+        return StreamingResponse(stream_translation(), media_type="text/event-stream")
+
     if cached:
-        # Find English text
-        for page in session.pages:
-            if page["page_number"] == request.page_number:
-                return TranslateResponse(
-                    page_number=request.page_number,
-                    english_text=page["text"],
-                    telugu_text=cached
-                )
-    
-    # Find the page
-    english_text = None
-    for page in session.pages:
-        if page["page_number"] == request.page_number:
-            english_text = page["text"]
-            break
-    
-    if english_text is None:
-        raise HTTPException(status_code=404, detail=f"Page {request.page_number} not found")
-    
+        return TranslateResponse(
+            page_number=request.page_number,
+            english_text=english_text,
+            telugu_text=cached
+        )
+
     # Translate
     try:
         telugu_text = await translate_to_telugu(english_text)
@@ -207,12 +273,30 @@ async def get_summary(request: SummaryRequest):
     if not session:
         raise HTTPException(status_code=404, detail="Session not found or expired")
     
-    # Combine all page text
-    full_text = "\n\n".join(p["text"] for p in session.pages)
+    # Combine all page text (cached on the session after the first call)
+    full_text = session_manager.get_full_text(request.session_id)
     
     if not full_text.strip():
         raise HTTPException(status_code=400, detail="No text available for summarization")
-    
+
+    # Stream summary chunks as SSE so the first bullet/sentence arrives
+    # without waiting for the full generation
+    if request.stream:
+        if request.language.value == "telugu":
+            # Telugu needs the complete English summary first, so only
+            # the translation step streams
+            summary = await generate_summary(full_text, request.summary_type.value)
+            chunks = translate_to_telugu_stream(summary)
+        else:
+            chunks = generate_summary_stream(full_text, request.summary_type.value)
+
+        async def stream_summary():
+            async for chunk in chunks:
+                yield f"data: {json.dumps(chunk)}\n\n"
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(stream_summary(), media_type="text/event-stream")
+
     try:
         # Generate English summary first
         summary = await generate_summary(full_text, request.summary_type.value)
@@ -247,24 +331,30 @@ async def get_characters(request: CharactersRequest):
         raise HTTPException(status_code=404, detail="Session not found or expired")
     
     try:
-        # Always extract in English first
-        characters = await extract_characters(session.pages)
+        # Always extract in English first, reusing the cached marked text
+        characters = await extract_characters(
+            session_manager.get_pages(request.session_id),
+            combined_text=session_manager.get_combined_marked(request.session_id)
+        )
         
         # Translate role and relationships if Telugu requested
         if request.language.value == "telugu":
+            # Flatten all role + relationship strings into one batched call
+            to_translate = []
+            for char in characters:
+                to_translate.append(char["role"])
+                to_translate.extend(char.get("relationships", []))
+
+            translated = await translate_batch_to_telugu(to_translate)
+
+            # Splice the translations back by index
+            translated_iter = iter(translated)
             translated_characters = []
             for char in characters:
-                # Translate role
-                translated_role = await translate_to_telugu(char["role"])
-                # Translate relationships
-                translated_rels = []
-                for rel in char.get("relationships", []):
-                    translated_rel = await translate_to_telugu(rel)
-                    translated_rels.append(translated_rel)
                 translated_characters.append({
                     "name": char["name"],  # Keep name in English
-                    "role": translated_role,
-                    "relationships": translated_rels,
+                    "role": next(translated_iter),
+                    "relationships": [next(translated_iter) for _ in char.get("relationships", [])],
                     "first_appearance_page": char["first_appearance_page"]
                 })
             characters = translated_characters
@@ -289,25 +379,21 @@ async def text_to_speech(request: TTSRequest):
     if not session:
         raise HTTPException(status_code=404, detail="Session not found or expired")
     
-    # Find the page text
-    text = None
-    for page in session.pages:
-        if page["page_number"] == request.page_number:
-            text = page["text"]
-            break
-    
+    # Find the page text (O(1) index lookup)
+    text = session_manager.get_page_text(request.session_id, request.page_number)
+
     if text is None:
         raise HTTPException(status_code=404, detail=f"Page {request.page_number} not found")
-    
-    # Generate speech
-    audio_bytes = generate_speech(text)
-    
-    if audio_bytes is None:
-        raise HTTPException(status_code=500, detail="Failed to generate audio")
-    
-    # Stream the audio (no Content-Disposition to prevent download)
+
+    # Stream audio chunks so playback starts before synthesis finishes
+    # (no Content-Disposition to prevent download). OpenAI tts-1 is
+    # used when TTS_PROVIDER=openai, otherwise per-sentence gTTS.
+    if TTS_PROVIDER == "openai":
+        audio_stream = generate_speech_openai_stream(text)
+    else:
+        audio_stream = generate_speech_stream(text)
     return StreamingResponse(
-        io.BytesIO(audio_bytes),
+        audio_stream,
         media_type="audio/mpeg",
         headers={
             # Explicitly NOT setting Content-Disposition to prevent download
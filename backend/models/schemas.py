@@ -41,6 +41,7 @@ class TranslateRequest(BaseModel):
     """Request to translate text to Telugu"""
     session_id: str
     page_number: int
+    stream: bool = False  # Stream translation chunks as SSE
 
 
 class TranslateResponse(BaseModel):
@@ -55,6 +56,7 @@ class SummaryRequest(BaseModel):
     session_id: str
     summary_type: SummaryType = SummaryType.SHORT
     language: Language = Language.ENGLISH
+    stream: bool = False  # Stream summary chunks as SSE
 
 
 class SummaryResponse(BaseModel):
@@ -2,23 +2,47 @@
 Services package initialization
 """
 from .session import session_manager, SessionManager, SessionData
-from .ocr import extract_text_from_image, validate_image
-from .translation import translate_to_telugu
-from .summary import generate_summary
+from .ocr import extract_text_from_image, extract_text_with_confidence, validate_image, validate_upload_file
+from .translation import translate_to_telugu, translate_to_telugu_stream, translate_batch_to_telugu, translate_many_to_telugu, submit_translation_batch
+from .summary import generate_summary, generate_summary_stream
 from .characters import extract_characters
-from .tts import generate_speech, get_audio_duration_estimate
-from .text_correction import correct_ocr_text
+from .tts import generate_speech, generate_speech_async, generate_speech_stream, generate_speech_openai_stream, get_audio_duration_estimate, warm_tts_session, TTS_PROVIDER
+from .text_correction import correct_ocr_text, correct_ocr_text_stream, correct_ocr_text_batch, correct_ocr_text_many, submit_correction_batch
+from .pipeline import process_pages
+from .parallel import process_many, call_with_retry
+from .batch import submit_batch, poll_batch
 
 __all__ = [
     "session_manager",
     "SessionManager", 
     "SessionData",
     "extract_text_from_image",
+    "extract_text_with_confidence",
     "validate_image",
+    "validate_upload_file",
     "translate_to_telugu",
+    "translate_to_telugu_stream",
+    "translate_batch_to_telugu",
+    "translate_many_to_telugu",
     "generate_summary",
+    "generate_summary_stream",
     "extract_characters",
     "generate_speech",
+    "generate_speech_async",
+    "generate_speech_stream",
+    "generate_speech_openai_stream",
+    "warm_tts_session",
+    "TTS_PROVIDER",
     "get_audio_duration_estimate",
-    "correct_ocr_text"
+    "correct_ocr_text",
+    "correct_ocr_text_stream",
+    "correct_ocr_text_batch",
+    "correct_ocr_text_many",
+    "process_pages",
+    "process_many",
+    "call_with_retry",
+    "submit_batch",
+    "poll_batch",
+    "submit_correction_batch",
+    "submit_translation_batch"
 ]
@@ -0,0 +1,69 @@
+"""
+Small bounded LRU cache used to memoize expensive service results.
+Everything stays in-memory - nothing is persisted to disk.
+"""
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+
+def llm_cache_key(model: str, system_prompt: str, text: str) -> str:
+    """
+    Content-hash key for a cached LLM response.
+
+    The model and system prompt are part of the digest, so a prompt or
+    model change invalidates old entries automatically.
+    """
+    return hashlib.blake2b(
+        (model + system_prompt + text).encode(), digest_size=16
+    ).hexdigest()
+
+
+class LRUCache:
+    """
+    Bounded least-recently-used cache.
+
+    Keys are content hashes (image digest, text hash), so identical
+    inputs skip the expensive OCR/LLM work entirely. The oldest entry
+    is evicted once the cap is reached; entries past the optional TTL
+    are dropped on access. Hit/miss counters are kept for tuning.
+    """
+
+    def __init__(self, maxsize: int = 256, ttl: Optional[float] = None):
+        self._maxsize = maxsize
+        self._ttl = ttl
+        self._data: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return the cached value for key, or None if absent or expired"""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            value, stored_at = entry
+            if self._ttl is not None and time.monotonic() - stored_at > self._ttl:
+                del self._data[key]
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: Hashable, value: Any) -> None:
+        """Insert a value, evicting the least-recently-used entry if full"""
+        with self._lock:
+            self._data[key] = (value, time.monotonic())
+            self._data.move_to_end(key)
+            while len(self._data) > self._maxsize:
+                self._data.popitem(last=False)
+
+    def stats(self) -> dict:
+        """Hit/miss counters and current size, for logging"""
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "size": len(self._data)}
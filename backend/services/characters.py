@@ -2,27 +2,25 @@
 Character extraction service using OpenAI API.
 Extracts character information including names, roles, relationships, and first appearances.
 """
-import os
 import json
-from pathlib import Path
-from openai import OpenAI
-from dotenv import load_dotenv
-from typing import List, Dict
+from typing import List, Dict, Optional
 
-# Load .env from backend directory
-env_path = Path(__file__).parent.parent / '.env'
-load_dotenv(dotenv_path=env_path, override=True)
+from .openai_client import client
 
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
 
-
-async def extract_characters(pages: List[Dict]) -> List[Dict]:
+async def extract_characters(
+    pages: List[Dict],
+    combined_text: Optional[str] = None
+) -> List[Dict]:
     """
     Extract character information from the text.
-    
+
     Args:
         pages: List of {"page_number": int, "text": str}
-    
+        combined_text: Optional precomputed text with [PAGE X] markers
+                       (e.g. the session's cached copy); built from
+                       pages when not provided
+
     Returns:
         List of character dictionaries with:
         - name: Character name
@@ -33,11 +31,13 @@ async def extract_characters(pages: List[Dict]) -> List[Dict]:
     if not pages:
         return []
     
-    # Combine all text with page markers
-    combined_text = ""
-    for page in sorted(pages, key=lambda x: x["page_number"]):
-        combined_text += f"\n[PAGE {page['page_number']}]\n{page['text']}\n"
-    
+    # Combine all text with page markers (unless already provided)
+    if combined_text is None:
+        combined_text = "".join(
+            f"\n[PAGE {page['page_number']}]\n{page['text']}\n"
+            for page in sorted(pages, key=lambda x: x["page_number"])
+        )
+
     if not combined_text.strip():
         return []
     
@@ -64,7 +64,7 @@ Output ONLY valid JSON array, no markdown formatting:
 ]"""
 
     try:
-        response = client.chat.completions.create(
+        response = await client.chat.completions.create(
             model="gpt-4o-mini",
             messages=[
                 {"role": "system", "content": system_prompt},
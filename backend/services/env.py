@@ -0,0 +1,30 @@
+"""
+Single .env load shared by every service module.
+Each module previously ran its own load_dotenv at import, re-reading
+the same file; under a reloading dev server that repeats constantly.
+Calling load_env() here parses backend/.env exactly once per process.
+"""
+import functools
+import os
+from pathlib import Path
+from typing import Optional
+
+from dotenv import load_dotenv
+
+_ENV_PATH = Path(__file__).parent.parent / '.env'
+_LOADED = False
+
+
+def load_env() -> None:
+    """Load backend/.env into the environment; later calls are no-ops"""
+    global _LOADED
+    if not _LOADED:
+        load_dotenv(dotenv_path=_ENV_PATH, override=True)
+        _LOADED = True
+
+
+@functools.cache
+def get_openai_api_key() -> Optional[str]:
+    """The OpenAI API key, looked up once after the .env load"""
+    load_env()
+    return os.getenv("OPENAI_API_KEY")
@@ -3,100 +3,366 @@ OCR service using pytesseract for text extraction.
 All processing is done in-memory - no files are saved.
 """
 import pytesseract
-from PIL import Image, ImageEnhance, ImageFilter
+from pytesseract import Output
+import cv2
+import numpy as np
+from PIL import Image
+import hashlib
 import io
 import os
-from typing import Optional
+import struct
+import threading
+from typing import BinaryIO, Optional, Union
 
-# Configure Tesseract path for Windows (default installation location)
+from .cache import LRUCache
+from . import ocr_kernels
+
+# Prefer tesserocr (in-process libtesseract via the C API) over
+# pytesseract, which spawns a tesseract subprocess per image
+try:
+    import tesserocr
+    from tesserocr import PSM, OEM
+    TESSEROCR_AVAILABLE = True
+except ImportError:
+    TESSEROCR_AVAILABLE = False
+
+# Run preprocessing on the GPU when CuPy and a CUDA device are present
+# (install e.g. cupy-cuda12x); the pixel ops are trivially data-parallel
+try:
+    import cupy as cp
+    from cupyx.scipy import ndimage as cp_ndimage
+    GPU_AVAILABLE = cp.cuda.runtime.getDeviceCount() > 0
+except Exception:
+    cp = None
+    cp_ndimage = None
+    GPU_AVAILABLE = False
+
+# Configure Tesseract path for Windows (default installation location),
+# only needed for the pytesseract subprocess fallback
 if os.name == 'nt':  # Windows
     tesseract_path = r'C:\Program Files\Tesseract-OCR\tesseract.exe'
     if os.path.exists(tesseract_path):
         pytesseract.pytesseract.tesseract_cmd = tesseract_path
 
+# One warm engine per thread - PyTessBaseAPI is not safe to share
+# across threads
+_tess_local = threading.local()
+
+# Reusable per-thread output buffer for preprocessing; pages in a
+# multi-page upload are usually the same size, so reuse avoids a ~3 MB
+# allocation per page
+_scratch = threading.local()
+
+
+def _get_scratch_buffer(shape: tuple) -> np.ndarray:
+    """Get this thread's scratch buffer, reallocating only on shape change"""
+    buf = getattr(_scratch, 'buf', None)
+    if buf is None or buf.shape != shape:
+        buf = np.empty(shape, np.uint8)
+        _scratch.buf = buf
+    return buf
+
+
+def _get_tesserocr_api():
+    """Get (or lazily create) this thread's resident tesserocr engine"""
+    api = getattr(_tess_local, 'api', None)
+    if api is None:
+        api = tesserocr.PyTessBaseAPI(lang='eng', psm=PSM.AUTO, oem=OEM.DEFAULT)
+        _tess_local.api = api
+    return api
+
+# Memoize OCR output by image content hash - re-uploads of the same
+# page skip Tesseract entirely
+_ocr_cache = LRUCache(maxsize=256)
+
 
 def preprocess_image(image: Image.Image) -> Image.Image:
     """
     Preprocess image for better OCR results.
-    
+
     Steps:
     1. Convert to grayscale
-    2. Increase contrast
-    3. Apply slight sharpening
-    4. Resize if too small
+    2. Resize if too small
+    3. Increase contrast
+    4. Apply slight sharpening (unsharp mask)
+
+    Contrast and sharpening are fused into a single NumPy pass over the
+    pixel array instead of chaining PIL enhancers, which each allocated
+    a new intermediate image.
     """
     # Convert to grayscale
     if image.mode != 'L':
         image = image.convert('L')
-    
-    # Resize if image is small (OCR works better on larger images)
-    width, height = image.size
+
+    arr = np.asarray(image)
+
+    if GPU_AVAILABLE:
+        return _preprocess_image_gpu(arr)
+
+    # Resize if image is small (OCR works better on larger images);
+    # done first so the per-pixel ops below touch fewer pixels when
+    # the image is already large
+    height, width = arr.shape
     if width < 1000:
         scale = 1500 / width
         new_size = (int(width * scale), int(height * scale))
-        image = image.resize(new_size, Image.Resampling.LANCZOS)
-    
-    # Increase contrast
-    enhancer = ImageEnhance.Contrast(image)
-    image = enhancer.enhance(1.5)
-    
-    # Increase sharpness
-    enhancer = ImageEnhance.Sharpness(image)
-    image = enhancer.enhance(1.5)
-    
-    # Apply slight blur to reduce noise, then sharpen
-    image = image.filter(ImageFilter.MedianFilter(size=1))
-    
-    return image
+        arr = cv2.resize(arr, new_size, interpolation=cv2.INTER_LANCZOS4)
+
+    if ocr_kernels.NUMBA_AVAILABLE:
+        # Single fused pass: contrast + unsharp mask, writing into the
+        # thread's reusable scratch buffer (no per-page allocation)
+        dst = _get_scratch_buffer(arr.shape)
+        ocr_kernels.preprocess_gray(arr, dst)
+        return Image.fromarray(dst, 'L')
+
+    arr = arr.astype(np.float32)
+
+    # Increase contrast (factor 1.5 around mid-gray)
+    arr = (arr - 128.0) * 1.5 + 128.0
 
+    # Sharpen via unsharp mask
+    arr += 0.5 * (arr - cv2.GaussianBlur(arr, (0, 0), 1.0))
 
-def extract_text_from_image(image_bytes: bytes) -> Optional[str]:
+    arr = np.clip(arr, 0, 255).astype(np.uint8)
+    return Image.fromarray(arr, 'L')
+
+
+def _preprocess_image_gpu(arr: np.ndarray) -> Image.Image:
     """
-    Extract English text from an image using OCR.
-    
+    GPU variant of the preprocessing pipeline (resize, contrast,
+    unsharp mask) using CuPy; only called when a CUDA device exists.
+    """
+    img = cp.asarray(arr, dtype=cp.float32)
+
+    # Resize if image is small (OCR works better on larger images)
+    height, width = img.shape
+    if width < 1000:
+        scale = 1500 / width
+        img = cp_ndimage.zoom(img, scale, order=1)
+
+    # Increase contrast (factor 1.5 around mid-gray)
+    img = (img - 128.0) * 1.5 + 128.0
+
+    # Sharpen via unsharp mask
+    img += 0.5 * (img - cp_ndimage.gaussian_filter(img, 1.0))
+
+    img = cp.clip(img, 0, 255).astype(cp.uint8)
+    return Image.fromarray(cp.asnumpy(img), 'L')
+
+
+def _assemble_text_from_data(data: dict) -> str:
+    """
+    Rebuild line/paragraph structure from pytesseract word-level data.
+
+    Lines within a paragraph join with a newline; a block or paragraph
+    change emits a blank line, matching image_to_string output so the
+    downstream paragraph-based chunking still finds boundaries.
+    """
+    pieces = []
+    current_key = None
+    current_words = []
+    for i, word in enumerate(data['text']):
+        if not word.strip():
+            continue
+        key = (data['block_num'][i], data['par_num'][i], data['line_num'][i])
+        if key != current_key:
+            if current_words:
+                pieces.append(" ".join(current_words))
+                # Blank line between paragraphs/blocks, newline between
+                # lines of the same paragraph
+                pieces.append("\n\n" if key[:2] != current_key[:2] else "\n")
+            current_key = key
+            current_words = []
+        current_words.append(word)
+    if current_words:
+        pieces.append(" ".join(current_words))
+    return "".join(pieces)
+
+
+def extract_text_with_confidence(
+    image_src: Union[bytes, BinaryIO]
+) -> tuple[Optional[str], float]:
+    """
+    Extract English text from an image using OCR, with a confidence score.
+
     Args:
-        image_bytes: Raw image data (JPG/PNG)
-    
+        image_src: Raw image data (JPG/PNG), or an open file-like
+                   object (e.g. a spooled upload) that PIL can
+                   stream-decode without an extra in-memory copy
+
     Returns:
-        Extracted text string, or None if extraction fails
-    
+        Tuple of (extracted_text, mean_word_confidence). Text is None
+        and confidence 0.0 if extraction fails. Confidence is Tesseract's
+        mean per-word confidence on a 0-100 scale; callers can use it to
+        skip downstream AI correction for clean scans.
+
     Note:
         - Processing is done entirely in-memory
         - No image data is saved to disk
     """
+    cache_key = None
+    if isinstance(image_src, (bytes, bytearray)):
+        # Return cached result for previously seen images
+        cache_key = hashlib.blake2b(image_src, digest_size=16).digest()
+        cached = _ocr_cache.get(cache_key)
+        if cached is not None:
+            return cached
+        image_src = io.BytesIO(image_src)
+
     try:
-        # Load image from bytes (in-memory)
-        image = Image.open(io.BytesIO(image_bytes))
-        
+        # Stream-decode the image (in-memory)
+        image = Image.open(image_src)
+
         # Convert to RGB if necessary (handles PNG with alpha)
         if image.mode in ('RGBA', 'LA', 'P'):
             image = image.convert('RGB')
-        
+
         # Preprocess image for better OCR
         processed_image = preprocess_image(image)
-        
+
         # Perform OCR with English language
         # PSM 3 = Fully automatic page segmentation (default)
         # PSM 6 = Assume a single uniform block of text
         # OEM 3 = Default, based on what is available
-        text = pytesseract.image_to_string(
-            processed_image,
-            lang='eng',
-            config='--oem 3 --psm 3'  # Fully automatic page segmentation
-        )
-        
+        if TESSEROCR_AVAILABLE:
+            # In-process engine: the PIL buffer is handed to
+            # libtesseract directly, no subprocess spawn or pipe copy
+            api = _get_tesserocr_api()
+            api.SetImage(processed_image)
+            text = api.GetUTF8Text()
+            mean_conf = float(api.MeanTextConf())
+        else:
+            data = pytesseract.image_to_data(
+                processed_image,
+                lang='eng',
+                config='--oem 3 --psm 3',  # Fully automatic page segmentation
+                output_type=Output.DICT
+            )
+            text = _assemble_text_from_data(data)
+            confs = [float(c) for c in data['conf'] if float(c) > 0]
+            mean_conf = sum(confs) / len(confs) if confs else 0.0
+
         # Clean up the extracted text
         text = text.strip()
-        
+
         # Close the images to free memory
         image.close()
         processed_image.close()
-        
-        return text if text else None
-        
+
+        if text:
+            if cache_key is not None:
+                _ocr_cache.put(cache_key, (text, mean_conf))
+            return text, mean_conf
+        return None, 0.0
+
     except Exception as e:
         print(f"[OCR] Error extracting text: {e}")
-        return None
+        return None, 0.0
+
+
+def extract_text_from_image(image_src: Union[bytes, BinaryIO]) -> Optional[str]:
+    """
+    Extract English text from an image using OCR.
+
+    Thin wrapper around extract_text_with_confidence for callers that
+    don't need the confidence score.
+    """
+    text, _ = extract_text_with_confidence(image_src)
+    return text
+
+
+# JPEG start-of-frame markers that carry the image dimensions
+# (0xC4/0xC8/0xCC are huffman/arithmetic tables, not frames)
+_JPEG_SOF_MARKERS = frozenset(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+
+
+def _parse_image_header(data: bytes) -> Optional[tuple[str, int, int]]:
+    """
+    Read format and dimensions from JPEG/PNG magic bytes alone.
+
+    Returns (format, width, height), or None if the header is not
+    recognized - callers then fall back to a PIL header parse.
+    """
+    # PNG: fixed signature, dimensions in the IHDR chunk
+    if data[:8] == b'\x89PNG\r\n\x1a\n' and len(data) >= 24:
+        width, height = struct.unpack('>II', data[16:24])
+        return 'PNG', width, height
+
+    # JPEG: walk the marker segments to the first start-of-frame
+    if data[:3] == b'\xff\xd8\xff':
+        i = 2
+        while i + 9 < len(data):
+            if data[i] != 0xFF:
+                break
+            marker = data[i + 1]
+            if marker in _JPEG_SOF_MARKERS:
+                height, width = struct.unpack('>HH', data[i + 5:i + 9])
+                return 'JPEG', width, height
+            if marker == 0x01 or 0xD0 <= marker <= 0xD8:
+                # Standalone markers have no length field
+                i += 2
+                continue
+            segment_len = struct.unpack('>H', data[i + 2:i + 4])[0]
+            i += 2 + segment_len
+
+    return None
+
+
+def _check_dimensions(width: int, height: int) -> str:
+    """Shared dimension bounds check; returns an error message or ''"""
+    if width < 100 or height < 100:
+        return "Image too small. Minimum 100x100 pixels."
+    if width > 10000 or height > 10000:
+        return "Image too large. Maximum 10000x10000 pixels."
+    return ""
+
+
+def validate_upload_file(file_obj: BinaryIO) -> tuple[bool, str]:
+    """
+    Validate an uploaded image without buffering the whole file.
+
+    Size comes from seeking the (spooled) file; format and dimensions
+    come from PIL's header parse, which reads only the first few KB.
+    The file position is rewound so the caller can still read the body.
+
+    Args:
+        file_obj: Open file-like object positioned anywhere
+
+    Returns:
+        Tuple of (is_valid, error_message)
+    """
+    try:
+        # Size check via seek/tell - no data is read
+        file_obj.seek(0, 2)
+        size = file_obj.tell()
+        file_obj.seek(0)
+        if size > 10 * 1024 * 1024:
+            return False, "Image too large. Maximum size is 10MB."
+
+        # Cheap magic-byte sniff on the leading bytes (64KB covers JPEG
+        # headers even with large EXIF blocks)
+        sniffed = _parse_image_header(file_obj.read(65536))
+        file_obj.seek(0)
+        if sniffed is not None:
+            _, width, height = sniffed
+        else:
+            # Unknown header - let PIL parse it (still header-only)
+            image = Image.open(file_obj)
+            if image.format not in ('JPEG', 'PNG', 'JPG'):
+                return False, f"Unsupported format: {image.format}. Use JPG or PNG."
+            width, height = image.size
+
+        error = _check_dimensions(width, height)
+        if error:
+            return False, error
+
+        return True, ""
+
+    except Exception as e:
+        return False, f"Invalid image file: {str(e)}"
+
+    finally:
+        file_obj.seek(0)
 
 
 def validate_image(image_bytes: bytes) -> tuple[bool, str]:
@@ -110,25 +376,28 @@ def validate_image(image_bytes: bytes) -> tuple[bool, str]:
         Tuple of (is_valid, error_message)
     """
     try:
-        image = Image.open(io.BytesIO(image_bytes))
-        
-        # Check format
-        if image.format not in ('JPEG', 'PNG', 'JPG'):
-            return False, f"Unsupported format: {image.format}. Use JPG or PNG."
-        
         # Check size (max 10MB)
         if len(image_bytes) > 10 * 1024 * 1024:
             return False, "Image too large. Maximum size is 10MB."
-        
+
+        # Cheap magic-byte sniff - no image decode
+        sniffed = _parse_image_header(image_bytes)
+        if sniffed is not None:
+            _, width, height = sniffed
+        else:
+            # Unknown header - let PIL parse it (still header-only)
+            image = Image.open(io.BytesIO(image_bytes))
+            if image.format not in ('JPEG', 'PNG', 'JPG'):
+                return False, f"Unsupported format: {image.format}. Use JPG or PNG."
+            width, height = image.size
+            image.close()
+
         # Check dimensions (reasonable book page size)
-        width, height = image.size
-        if width < 100 or height < 100:
-            return False, "Image too small. Minimum 100x100 pixels."
-        if width > 10000 or height > 10000:
-            return False, "Image too large. Maximum 10000x10000 pixels."
-        
-        image.close()
+        error = _check_dimensions(width, height)
+        if error:
+            return False, error
+
         return True, ""
-        
+
     except Exception as e:
         return False, f"Invalid image file: {str(e)}"
@@ -0,0 +1,53 @@
+"""
+Numba-JIT kernel for OCR image preprocessing.
+Fuses contrast stretch and a 3x3 unsharp mask into a single pass over
+the pixel array. Falls back to the NumPy path in ocr.py when Numba is
+not installed.
+"""
+import numpy as np
+
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+# Same tuning as the NumPy path in ocr.py
+_CONTRAST = 1.5
+_SHARPEN = 0.5
+_INV9 = 1.0 / 9.0  # multiply instead of divide so LLVM can vectorize
+
+
+if NUMBA_AVAILABLE:
+
+    @njit(parallel=True, fastmath=True, cache=True)
+    def preprocess_gray(src: np.ndarray, dst: np.ndarray) -> None:
+        """
+        Apply contrast stretch + 3x3 unsharp mask in one loop nest.
+
+        src and dst are preallocated uint8 arrays of the same shape;
+        dst is written in place so no temporary is allocated inside
+        the JIT-compiled region. Rows are parallelized with prange.
+        """
+        h, w = src.shape
+        for y in prange(h):
+            for x in range(w):
+                c = (src[y, x] - 128.0) * _CONTRAST + 128.0
+
+                # 3x3 box blur of contrasted neighbors (edges clamp to
+                # the contrast-only value)
+                if 0 < y < h - 1 and 0 < x < w - 1:
+                    s = 0.0
+                    for dy in range(-1, 2):
+                        for dx in range(-1, 2):
+                            s += (src[y + dy, x + dx] - 128.0) * _CONTRAST + 128.0
+                    blur = s * _INV9
+                else:
+                    blur = c
+
+                v = c + _SHARPEN * (c - blur)
+                if v < 0.0:
+                    v = 0.0
+                elif v > 255.0:
+                    v = 255.0
+                dst[y, x] = np.uint8(v)
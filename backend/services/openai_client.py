@@ -0,0 +1,33 @@
+"""
+Shared AsyncOpenAI client used by every LLM-backed service.
+One connection pool with HTTP/2 keep-alive means calls reuse warm
+TLS connections instead of each module opening its own.
+"""
+import httpx
+from openai import AsyncOpenAI
+
+from .env import get_openai_api_key
+
+api_key = get_openai_api_key()
+if not api_key or api_key == "your_openai_api_key_here":
+    print("[OpenAI] WARNING: OPENAI_API_KEY not set in .env file")
+
+# Bounded pool sized for bursty fan-outs (page batches, chunked
+# pages): enough keep-alive connections that a burst never pays fresh
+# TLS handshakes, with a hard cap so a stampede can't exhaust sockets.
+# Retries stay with the OpenAI SDK, not the transport.
+# The limits must be built into the transport: AsyncClient ignores its
+# limits argument when an explicit transport is supplied.
+_http_client = httpx.AsyncClient(
+    transport=httpx.AsyncHTTPTransport(
+        retries=0,
+        http2=True,
+        limits=httpx.Limits(
+            max_connections=100,
+            max_keepalive_connections=50,
+            keepalive_expiry=60
+        )
+    )
+)
+
+client = AsyncOpenAI(api_key=api_key, http_client=_http_client)
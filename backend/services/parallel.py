@@ -0,0 +1,208 @@
+"""
+Throttled parallel request processor for OpenAI chat completions.
+A bare gather over a large job either serializes or trips 429s; this
+paces calls with dual leaky buckets (requests/min and tokens/min) and
+retries transient failures with exponential backoff.
+"""
+import asyncio
+import functools
+import random
+import time
+from typing import List
+
+import openai
+import tiktoken
+
+from .openai_client import client
+
+# Conservative defaults for the gpt-4o-mini tier
+MAX_REQUESTS_PER_MINUTE = 500
+MAX_TOKENS_PER_MINUTE = 200_000
+
+# Tokenizer for pre-counting prompt tokens
+_enc = tiktoken.encoding_for_model("gpt-4o-mini")
+
+
+def count_tokens(text: str) -> int:
+    """Token count of a text under the gpt-4o-mini encoding"""
+    return len(_enc.encode(text))
+
+
+def split_paragraphs(text: str, max_tokens: int = 1500) -> List[str]:
+    """
+    Greedily pack paragraphs into chunks of at most max_tokens.
+
+    Splits on blank lines so chunk boundaries never fall mid-paragraph;
+    a single paragraph larger than the budget becomes its own chunk.
+
+    Args:
+        text: Source text with \\n\\n paragraph separators
+        max_tokens: Token budget per chunk
+
+    Returns:
+        List of chunks that rejoin with \\n\\n to the original text
+    """
+    chunks = []
+    current = []
+    current_tokens = 0
+    for paragraph in text.split("\n\n"):
+        tokens = count_tokens(paragraph)
+        if current and current_tokens + tokens > max_tokens:
+            chunks.append("\n\n".join(current))
+            current = []
+            current_tokens = 0
+        current.append(paragraph)
+        current_tokens += tokens
+    if current:
+        chunks.append("\n\n".join(current))
+    return chunks
+
+
+def pack_texts(texts: List[str], max_tokens: int = 2000) -> List[List[str]]:
+    """
+    Greedily pack short texts into contiguous groups under max_tokens.
+
+    Groups preserve input order, so per-group results concatenate back
+    into one aligned list. A single text larger than the budget becomes
+    its own group.
+
+    Args:
+        texts: Independent short texts
+        max_tokens: Token budget per group
+
+    Returns:
+        List of groups covering the input in order
+    """
+    groups = []
+    current = []
+    current_tokens = 0
+    for text in texts:
+        tokens = count_tokens(text)
+        if current and current_tokens + tokens > max_tokens:
+            groups.append(current)
+            current = []
+            current_tokens = 0
+        current.append(text)
+        current_tokens += tokens
+    if current:
+        groups.append(current)
+    return groups
+
+
+@functools.lru_cache(maxsize=32)
+def _system_prompt_tokens(system_prompt: str) -> int:
+    """Token count for a system prompt - the handful of prompts in this
+    app are constants, so each is tokenized exactly once"""
+    return len(_enc.encode(system_prompt))
+
+
+class RateLimiter:
+    """
+    Dual leaky-bucket limiter: capacity refills continuously at the
+    per-minute rates and each call consumes one request plus its
+    estimated token count.
+    """
+
+    def __init__(self, max_rpm: int, max_tpm: int):
+        self._max_rpm = max_rpm
+        self._max_tpm = max_tpm
+        self._request_capacity = float(max_rpm)
+        self._token_capacity = float(max_tpm)
+        self._last_refill = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self, tokens: int) -> None:
+        """Block until one request slot and the given tokens are available"""
+        # A request bigger than the whole per-minute budget could never
+        # be satisfied and would spin forever - admit it at the cost of
+        # draining the full bucket instead
+        tokens = min(tokens, self._max_tpm)
+        while True:
+            async with self._lock:
+                now = time.monotonic()
+                elapsed = now - self._last_refill
+                self._request_capacity = min(
+                    float(self._max_rpm),
+                    self._request_capacity + self._max_rpm * elapsed / 60.0
+                )
+                self._token_capacity = min(
+                    float(self._max_tpm),
+                    self._token_capacity + self._max_tpm * elapsed / 60.0
+                )
+                self._last_refill = now
+
+                if self._request_capacity >= 1 and self._token_capacity >= tokens:
+                    self._request_capacity -= 1
+                    self._token_capacity -= tokens
+                    return
+            await asyncio.sleep(0.25)
+
+
+# Shared limiter for all throttled work in this process
+_limiter = RateLimiter(MAX_REQUESTS_PER_MINUTE, MAX_TOKENS_PER_MINUTE)
+
+
+async def call_with_retry(payload: dict, max_attempts: int = 5) -> str:
+    """
+    Issue one chat completion, retrying rate-limit and connection
+    errors with exponential backoff plus jitter.
+
+    Args:
+        payload: Keyword arguments for chat.completions.create
+        max_attempts: Attempts before the last error is re-raised
+
+    Returns:
+        The completion text
+    """
+    for attempt in range(max_attempts):
+        try:
+            response = await client.chat.completions.create(**payload)
+            return response.choices[0].message.content
+        except (openai.RateLimitError, openai.APIConnectionError):
+            if attempt == max_attempts - 1:
+                raise
+            await asyncio.sleep(2 ** attempt + random.random())
+
+
+async def process_many(
+    prompts: List[str],
+    system_prompt: str,
+    model: str = "gpt-4o-mini",
+    temperature: float = 0.1,
+    max_tokens: int = 4000
+) -> List[str]:
+    """
+    Run one chat completion per prompt concurrently, throttled by the
+    shared rate limiter. Results come back in input order.
+
+    Args:
+        prompts: User messages, one request each
+        system_prompt: System message shared by every request
+        model: Chat model name
+        temperature: Sampling temperature
+        max_tokens: Completion cap per request
+
+    Returns:
+        List of completion texts, same order as prompts
+    """
+    if not prompts:
+        return []
+
+    # System prompt tokens are identical for every request - count once
+    system_tokens = _system_prompt_tokens(system_prompt)
+
+    async def one_call(prompt: str) -> str:
+        # Budget input plus the completion cap against the TPM bucket
+        tokens = system_tokens + len(_enc.encode(prompt)) + max_tokens
+        await _limiter.acquire(tokens)
+        return await call_with_retry({
+            "model": model,
+            "messages": [
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": prompt}
+            ],
+            "temperature": temperature,
+            "max_tokens": max_tokens
+        })
+
+    return list(await asyncio.gather(*[one_call(p) for p in prompts]))
@@ -0,0 +1,41 @@
+"""
+Orchestration helpers that fan independent LLM calls out concurrently.
+Correction and translation are network-bound, so a batch of pages
+completes in roughly one round-trip instead of one per page.
+"""
+import asyncio
+from typing import List, Optional, Tuple
+
+from .text_correction import correct_ocr_text
+from .translation import translate_to_telugu
+
+
+async def process_pages(
+    page_texts: List[str],
+    translate: bool = False
+) -> Tuple[List[str], Optional[List[str]]]:
+    """
+    Correct all pages concurrently, optionally translating the results.
+
+    Args:
+        page_texts: Raw OCR text, one entry per page
+        translate: Also translate each corrected page to Telugu
+
+    Returns:
+        Tuple of (corrected_texts, translations); translations is None
+        unless translate is set. Both lists keep input order.
+    """
+    if not page_texts:
+        return [], [] if translate else None
+
+    corrected = list(await asyncio.gather(
+        *[correct_ocr_text(text) for text in page_texts]
+    ))
+
+    if not translate:
+        return corrected, None
+
+    translations = list(await asyncio.gather(
+        *[translate_to_telugu(text) for text in corrected]
+    ))
+    return corrected, translations
@@ -4,13 +4,15 @@ All data is stored in-memory only - no persistence.
 """
 import uuid
 import asyncio
-from datetime import datetime, timedelta
+import heapq
+import time
 from typing import Dict, Optional, List
 from dataclasses import dataclass, field
 import os
-from dotenv import load_dotenv
 
-load_dotenv()
+from .env import load_env
+
+load_env()
 
 # Session TTL from environment (default 1 hour)
 SESSION_TTL_SECONDS = int(os.getenv("SESSION_TTL_SECONDS", 3600))
@@ -20,13 +22,18 @@ SESSION_TTL_SECONDS = int(os.getenv("SESSION_TTL_SECONDS", 3600))
 class SessionData:
     """In-memory session data container"""
     session_id: str
-    created_at: datetime
-    last_accessed: datetime
-    pages: List[Dict] = field(default_factory=list)  # [{page_number, text}]
+    created_at: float  # time.monotonic() seconds
+    last_accessed: float  # time.monotonic() seconds
+    # Page texts stored as a flat list (index = page number - 1); far
+    # cheaper than a list of per-page dicts and indexable in O(1)
+    page_texts: List[str] = field(default_factory=list)
     translations: Dict[int, str] = field(default_factory=dict)  # page_number -> telugu text
     summary_short: Optional[str] = None
     summary_medium: Optional[str] = None
     characters: Optional[List[Dict]] = None
+    # Cached derived strings, invalidated whenever a page is added
+    full_text_cache: Optional[str] = None
+    combined_marked_cache: Optional[str] = None
 
 
 class SessionManager:
@@ -38,23 +45,29 @@ class SessionManager:
     def __init__(self):
         self._sessions: Dict[str, SessionData] = {}
         self._cleanup_task: Optional[asyncio.Task] = None
-    
+        # Min-heap of (expiry_time, session_id); entries are invalidated
+        # lazily by checking the session's actual last_accessed on pop
+        self._expiry_heap: List[tuple[float, str]] = []
+
     def create_session(self) -> str:
         """Create a new session and return its ID"""
         session_id = str(uuid.uuid4())
-        now = datetime.now()
+        now = time.monotonic()
         self._sessions[session_id] = SessionData(
             session_id=session_id,
             created_at=now,
             last_accessed=now
         )
+        heapq.heappush(self._expiry_heap, (now + SESSION_TTL_SECONDS, session_id))
         return session_id
-    
+
     def get_session(self, session_id: str) -> Optional[SessionData]:
         """Get session data, updating last accessed time"""
         session = self._sessions.get(session_id)
         if session:
-            session.last_accessed = datetime.now()
+            now = time.monotonic()
+            session.last_accessed = now
+            heapq.heappush(self._expiry_heap, (now + SESSION_TTL_SECONDS, session_id))
         return session
     
     def delete_session(self, session_id: str) -> bool:
@@ -62,7 +75,7 @@ class SessionManager:
         if session_id in self._sessions:
             # Clear all data explicitly
             session = self._sessions[session_id]
-            session.pages.clear()
+            session.page_texts.clear()
             session.translations.clear()
             session.summary_short = None
             session.summary_medium = None
@@ -79,14 +92,53 @@ class SessionManager:
         """Add extracted page text to session"""
         session = self.get_session(session_id)
         if session:
-            session.pages.append({"page_number": page_number, "text": text})
+            # Pad with empty slots for out-of-order page numbers
+            while len(session.page_texts) < page_number:
+                session.page_texts.append("")
+            session.page_texts[page_number - 1] = text
+            # Invalidate cached derived strings
+            session.full_text_cache = None
+            session.combined_marked_cache = None
             return True
         return False
-    
+
     def get_pages(self, session_id: str) -> Optional[List[Dict]]:
-        """Get all pages for a session"""
+        """Get all pages for a session in the {page_number, text} shape"""
+        session = self.get_session(session_id)
+        if not session:
+            return None
+        return [
+            {"page_number": i, "text": text}
+            for i, text in enumerate(session.page_texts, start=1)
+        ]
+
+    def get_page_text(self, session_id: str, page_number: int) -> Optional[str]:
+        """Get the text of a single page (O(1) list indexing)"""
+        session = self.get_session(session_id)
+        if not session or not 1 <= page_number <= len(session.page_texts):
+            return None
+        return session.page_texts[page_number - 1]
+
+    def get_full_text(self, session_id: str) -> Optional[str]:
+        """Get all page text combined, computed once and cached"""
+        session = self.get_session(session_id)
+        if not session:
+            return None
+        if session.full_text_cache is None:
+            session.full_text_cache = "\n\n".join(session.page_texts)
+        return session.full_text_cache
+
+    def get_combined_marked(self, session_id: str) -> Optional[str]:
+        """Get all page text with [PAGE X] markers, computed once and cached"""
         session = self.get_session(session_id)
-        return session.pages if session else None
+        if not session:
+            return None
+        if session.combined_marked_cache is None:
+            session.combined_marked_cache = "".join(
+                f"\n[PAGE {i}]\n{text}\n"
+                for i, text in enumerate(session.page_texts, start=1)
+            )
+        return session.combined_marked_cache
     
     def add_translation(self, session_id: str, page_number: int, telugu_text: str) -> bool:
         """Store translation for a page"""
@@ -102,26 +154,39 @@ class SessionManager:
         return session.translations.get(page_number) if session else None
     
     def _cleanup_expired_sessions(self):
-        """Remove sessions that have exceeded TTL"""
-        now = datetime.now()
-        ttl = timedelta(seconds=SESSION_TTL_SECONDS)
-        expired = [
-            sid for sid, session in self._sessions.items()
-            if now - session.last_accessed > ttl
-        ]
-        for sid in expired:
-            self.delete_session(sid)
-        return len(expired)
-    
+        """Pop and delete expired sessions from the expiry heap (O(log N) per pop)"""
+        now = time.monotonic()
+        count = 0
+        while self._expiry_heap and self._expiry_heap[0][0] <= now:
+            _, sid = heapq.heappop(self._expiry_heap)
+            session = self._sessions.get(sid)
+            if session is None:
+                # Already deleted - stale heap entry
+                continue
+            if now - session.last_accessed > SESSION_TTL_SECONDS:
+                self.delete_session(sid)
+                count += 1
+            # else: the session was accessed since this entry was pushed;
+            # a fresher heap entry will expire it later
+        return count
+
     async def start_cleanup_task(self):
         """Start background task to clean up expired sessions"""
         async def cleanup_loop():
             while True:
-                await asyncio.sleep(300)  # Check every 5 minutes
+                if self._expiry_heap:
+                    # Sleep exactly until the earliest possible expiry
+                    delay = self._expiry_heap[0][0] - time.monotonic()
+                    if delay > 0:
+                        await asyncio.sleep(delay)
+                else:
+                    # No sessions yet - poll for new ones
+                    await asyncio.sleep(60)
+                    continue
                 count = self._cleanup_expired_sessions()
                 if count > 0:
                     print(f"[SessionManager] Cleaned up {count} expired session(s)")
-        
+
         self._cleanup_task = asyncio.create_task(cleanup_loop())
     
     async def stop_cleanup_task(self):
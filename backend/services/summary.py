@@ -2,39 +2,20 @@
 Summary generation service using OpenAI API.
 Generates short (bullet points) or medium (paragraphs) summaries.
 """
-import os
-from pathlib import Path
-from openai import OpenAI
-from dotenv import load_dotenv
-from typing import Literal
+import hashlib
+from typing import AsyncIterator, Literal
 
-# Load .env from backend directory
-env_path = Path(__file__).parent.parent / '.env'
-load_dotenv(dotenv_path=env_path, override=True)
+from .cache import LRUCache
+from .session import SESSION_TTL_SECONDS
+from .openai_client import client
 
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+# Memoize summaries by (text hash, summary type) - asking for the same
+# summary twice skips the API call. Capped at the session TTL so
+# summaries never outlive the session that produced them.
+_summary_cache = LRUCache(maxsize=256, ttl=SESSION_TTL_SECONDS)
 
-
-async def generate_summary(
-    text: str, 
-    summary_type: Literal["short", "medium"]
-) -> str:
-    """
-    Generate a summary of the given text.
-    
-    Args:
-        text: Full text to summarize
-        summary_type: "short" for 5-7 bullet points, "medium" for 2-3 paragraphs
-    
-    Returns:
-        Formatted summary string
-    """
-    if not text.strip():
-        return ""
-    
-    # Different prompts for different summary types
-    if summary_type == "short":
-        system_prompt = """You are a skilled summarizer. Create a concise summary.
+# Shared by the blocking and streaming summary paths
+_SYSTEM_PROMPT_SHORT = """You are a skilled summarizer. Create a concise summary.
 
 Rules:
 1. Provide exactly 5-7 bullet points
@@ -48,8 +29,8 @@ Format:
 • Second key point
 ...
 """
-    else:  # medium
-        system_prompt = """You are a skilled summarizer. Create a medium-length summary.
+
+_SYSTEM_PROMPT_MEDIUM = """You are a skilled summarizer. Create a medium-length summary.
 
 Rules:
 1. Write exactly 2-3 well-structured paragraphs
@@ -61,8 +42,35 @@ Rules:
 
 Output only the paragraphs, no headers or labels."""
 
+
+async def generate_summary(
+    text: str, 
+    summary_type: Literal["short", "medium"]
+) -> str:
+    """
+    Generate a summary of the given text.
+    
+    Args:
+        text: Full text to summarize
+        summary_type: "short" for 5-7 bullet points, "medium" for 2-3 paragraphs
+    
+    Returns:
+        Formatted summary string
+    """
+    if not text.strip():
+        return ""
+
+    # Return cached summary for previously seen (text, type) pairs
+    cache_key = (hashlib.sha1(text.encode()).hexdigest(), summary_type)
+    cached = _summary_cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    # Different prompts for different summary types
+    system_prompt = _SYSTEM_PROMPT_SHORT if summary_type == "short" else _SYSTEM_PROMPT_MEDIUM
+
     try:
-        response = client.chat.completions.create(
+        response = await client.chat.completions.create(
             model="gpt-4o-mini",
             messages=[
                 {"role": "system", "content": system_prompt},
@@ -72,8 +80,66 @@ Output only the paragraphs, no headers or labels."""
             max_tokens=1000
         )
         
-        return response.choices[0].message.content.strip()
-        
+        summary = response.choices[0].message.content.strip()
+        _summary_cache.put(cache_key, summary)
+        return summary
+
     except Exception as e:
         print(f"[Summary] Error: {e}")
         raise Exception(f"Summary generation failed: {str(e)}")
+
+
+async def generate_summary_stream(
+    text: str,
+    summary_type: Literal["short", "medium"]
+) -> AsyncIterator[str]:
+    """
+    Generate a summary, yielding chunks as OpenAI streams them so the
+    client sees the first bullet/sentence almost immediately.
+
+    The assembled summary is written to the memo cache when the stream
+    completes, so later non-streaming calls still hit it.
+
+    Args:
+        text: Full text to summarize
+        summary_type: "short" for 5-7 bullet points, "medium" for 2-3 paragraphs
+
+    Yields:
+        Summary text fragments in generation order
+    """
+    if not text.strip():
+        return
+
+    # Previously generated summaries stream back as a single chunk
+    cache_key = (hashlib.sha1(text.encode()).hexdigest(), summary_type)
+    cached = _summary_cache.get(cache_key)
+    if cached is not None:
+        yield cached
+        return
+
+    system_prompt = _SYSTEM_PROMPT_SHORT if summary_type == "short" else _SYSTEM_PROMPT_MEDIUM
+
+    response = await client.chat.completions.create(
+        model="gpt-4o-mini",
+        messages=[
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": f"Summarize the following text:\n\n{text}"}
+        ],
+        temperature=0.5,
+        max_tokens=1000,
+        stream=True
+    )
+
+    parts = []
+    completed = False
+    try:
+        async for chunk in response:
+            if chunk.choices and chunk.choices[0].delta.content:
+                parts.append(chunk.choices[0].delta.content)
+                yield chunk.choices[0].delta.content
+        completed = True
+    finally:
+        # Cache only complete summaries - a disconnect or stream error
+        # here would otherwise poison the cache with a truncation
+        if completed and parts:
+            _summary_cache.put(cache_key, "".join(parts).strip())
@@ -2,52 +2,183 @@
 Text correction service using OpenAI API.
 Fixes common OCR errors and typos in extracted text.
 """
-import os
 import re
-from pathlib import Path
-from openai import OpenAI
-from dotenv import load_dotenv
+import json
+import asyncio
+import hashlib
+from typing import AsyncIterator, List
 
-# Load .env from backend directory
-env_path = Path(__file__).parent.parent / '.env'
-load_dotenv(dotenv_path=env_path, override=True)
+import numpy as np
 
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+from .cache import LRUCache, llm_cache_key
+from .session import SESSION_TTL_SECONDS
+from .openai_client import client
+from .batch import submit_batch
+from .parallel import process_many, count_tokens, split_paragraphs, pack_texts
 
+# Inputs above this many tokens are corrected as parallel paragraph
+# chunks so the response never hits the completion cap
+_CHUNK_TOKENS = 1500
 
-def is_text_severely_garbled(text: str) -> bool:
+# Token budget per packed batch request - the system prompt is paid
+# once per group instead of once per text
+_PACK_TOKENS = 2000
+
+# Memoize corrections so re-uploaded pages skip the API call. Entries
+# are keyed by page content, so they live no longer than a session
+# would - this app promises user text is gone within the session TTL.
+_correction_cache = LRUCache(maxsize=256, ttl=SESSION_TTL_SECONDS)
+
+# Garbled verdicts by content hash - retried corrections resend the
+# same text, so the check runs once per distinct page
+_garbled_cache = LRUCache(maxsize=256)
+
+# Standard correction prompt, shared by the interactive and Batch API paths
+_SYSTEM_PROMPT_STANDARD = """You are an OCR error correction specialist. Fix common OCR errors in the text while preserving the original meaning and structure.
+
+Common OCR errors to fix:
+- Character substitutions: beart→heart, \\ollows→follows, rn→m, cl→d, etc.
+- Number/letter confusion: 1→I (when it should be "I"), 0→O, 5→S
+- Broken words: re ligion→religion, asso ciation→association
+- Missing spaces between sentences
+- Random symbols that don't make sense in context
+
+Rules:
+1. ONLY fix obvious OCR errors - don't rewrite or paraphrase
+2. Keep the exact same structure, paragraphs, and line breaks
+3. Preserve proper nouns and names as-is
+4. If unsure, keep the original
+5. Output ONLY the corrected text, nothing else"""
+
+# Aggressive reconstruction prompt for severely garbled pages
+_SYSTEM_PROMPT_GARBLED = """You are an OCR error correction specialist dealing with SEVERELY GARBLED text from a poor quality image.
+
+The text is badly corrupted - many characters are wrong, words are broken, and some parts may be unreadable.
+
+Your task:
+1. Try to reconstruct readable English text from the garbled input
+2. Look for patterns and context clues to guess what words should be
+3. If a section is completely unreadable, mark it as [unclear]
+4. Keep the general structure (paragraphs, line breaks)
+5. Output ONLY the reconstructed text, nothing else
+
+Be aggressive in fixing errors - the original is definitely wrong."""
+
+
+# Single-character tokens, found without a full Python-level split.
+# Apostrophe lookarounds keep contraction tails (don't, it's) from
+# counting as single-char words the way bare \b\w\b would.
+_SINGLE_CHAR_WORD = re.compile(r"(?<![\w'])\w(?![\w'])")
+
+
+def is_text_severely_garbled(text: str, return_ratio: bool = False):
     """
     Detect if OCR text is severely garbled and likely unreadable.
-    
+
+    Runs before every correction, so the scans stay in C: one byte
+    histogram replaces the previous three Python-level passes.
+
     Signs of severe garbling:
     - Very high ratio of non-word characters
     - Very short average word length
     - Many words that don't look like English
+
+    With return_ratio, returns a (verdict, alpha_ratio) tuple so
+    callers can grade how unreadable the text is without rescanning.
     """
+    def result(verdict: bool, alpha_ratio: float):
+        return (verdict, alpha_ratio) if return_ratio else verdict
+
     if not text or len(text.strip()) < 50:
-        return False
-    
-    words = text.split()
-    if len(words) < 5:
-        return False
-    
+        return result(False, 1.0)
+
+    buf = np.frombuffer(text.encode('utf-8', 'ignore'), dtype=np.uint8)
+    counts = np.bincount(buf, minlength=256)
+
+    # Count words as runs of non-whitespace (tab/LF/CR/space), the way
+    # split() does - counting raw whitespace bytes would treat every
+    # blank line or double space as an extra word and deflate the
+    # average word length
+    ws_mask = (buf == 9) | (buf == 10) | (buf == 13) | (buf == 32)
+    word_count = int((~ws_mask[1:] & ws_mask[:-1]).sum())
+    if not ws_mask[0]:
+        word_count += 1
+    if word_count < 5:
+        return result(False, 1.0)
+
+    total_chars = buf.size - int(ws_mask.sum())
+    if total_chars <= 0:
+        return result(False, 1.0)
+
+    # Ratio of alphabetic characters among non-whitespace
+    alpha_chars = int(counts[65:91].sum() + counts[97:123].sum())
+    alpha_ratio = alpha_chars / total_chars
+
     # Check average word length (English avg is ~4.5 chars)
-    avg_word_len = sum(len(w) for w in words) / len(words)
-    if avg_word_len < 2.5:
-        return True
-    
-    # Check ratio of non-alphabetic characters
-    alpha_chars = sum(1 for c in text if c.isalpha())
-    total_chars = len(text.replace(' ', ''))
-    if total_chars > 0 and alpha_chars / total_chars < 0.6:
-        return True
-    
+    if total_chars / word_count < 2.5:
+        return result(True, alpha_ratio)
+
+    if alpha_ratio < 0.6:
+        return result(True, alpha_ratio)
+
     # Check for many single-character "words"
-    single_char_words = sum(1 for w in words if len(w) == 1 and w.lower() not in ['a', 'i'])
-    if single_char_words / len(words) > 0.3:
-        return True
-    
-    return False
+    single_char_words = sum(
+        1 for w in _SINGLE_CHAR_WORD.findall(text) if w.lower() not in ('a', 'i')
+    )
+    return result(single_char_words / word_count > 0.3, alpha_ratio)
+
+
+def _quick_garbled_check(text: str, sample: int = 256) -> tuple:
+    """
+    Cheap garbled signal for picking the correction prompt.
+
+    Garbling from a bad scan affects the whole page, so for long texts
+    sampling the head and tail gives the same coarse verdict as the
+    full histogram pass in O(1). Verdicts are memoized by content hash
+    because retries resend identical text.
+
+    Returns:
+        (verdict, alpha_ratio) tuple
+    """
+    key = hashlib.blake2b(text.encode(), digest_size=16).hexdigest()
+    cached = _garbled_cache.get(key)
+    if cached is not None:
+        return cached
+
+    if len(text) > 4 * sample:
+        verdict = is_text_severely_garbled(
+            text[:sample // 2] + text[-sample // 2:], return_ratio=True
+        )
+    else:
+        verdict = is_text_severely_garbled(text, return_ratio=True)
+
+    _garbled_cache.put(key, verdict)
+    return verdict
+
+
+def _completion_cap(text: str) -> int:
+    """
+    Completion cap sized to the input.
+
+    Corrected output is roughly as long as the input, so 1.5x plus
+    slack is enough; a tight cap shortens the decode slot OpenAI
+    schedules for the request instead of always reserving 4000 tokens.
+    """
+    return min(4000, int(count_tokens(text) * 1.5) + 64)
+
+
+async def _correct_chunk(chunk: str, system_prompt: str, temperature: float) -> str:
+    """Run one correction completion and return the stripped text"""
+    response = await client.chat.completions.create(
+        model="gpt-4o-mini",
+        messages=[
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": f"Fix OCR errors in this text:\n\n{chunk}"}
+        ],
+        temperature=temperature,
+        max_tokens=_completion_cap(chunk)
+    )
+    return response.choices[0].message.content.strip()
 
 
 async def correct_ocr_text(ocr_text: str) -> str:
@@ -73,63 +204,272 @@ async def correct_ocr_text(ocr_text: str) -> str:
     if len(ocr_text.strip()) < 20:
         return ocr_text
     
-    # Check if text is severely garbled
-    severely_garbled = is_text_severely_garbled(ocr_text)
+    # Check if text is severely garbled (sampled for long pages)
+    severely_garbled, alpha_ratio = _quick_garbled_check(ocr_text)
+
+    # Almost no letters at all: no model can reconstruct this, so skip
+    # the paid round-trip entirely
+    if severely_garbled and alpha_ratio < 0.3:
+        print("[TextCorrection] Input is mostly non-text, skipping correction")
+        return "[unreadable text]"
     
     try:
-        if severely_garbled:
-            # Use more aggressive reconstruction for severely garbled text
-            system_prompt = """You are an OCR error correction specialist dealing with SEVERELY GARBLED text from a poor quality image.
+        # Garbled pages get the aggressive reconstruction prompt
+        system_prompt = _SYSTEM_PROMPT_GARBLED if severely_garbled else _SYSTEM_PROMPT_STANDARD
+        temperature = 0.2 if severely_garbled else 0.1
 
-The text is badly corrupted - many characters are wrong, words are broken, and some parts may be unreadable.
+        # Keying on the prompt as well means a prompt tweak never
+        # serves stale corrections
+        cache_key = llm_cache_key("gpt-4o-mini", system_prompt, ocr_text)
+        cached = _correction_cache.get(cache_key)
+        if cached is not None:
+            return cached
 
-Your task:
-1. Try to reconstruct readable English text from the garbled input
-2. Look for patterns and context clues to guess what words should be
-3. If a section is completely unreadable, mark it as [unclear]
-4. Keep the general structure (paragraphs, line breaks)
-5. Output ONLY the reconstructed text, nothing else
-
-Be aggressive in fixing errors - the original is definitely wrong."""
+        # Long pages are corrected as parallel paragraph chunks: each
+        # stays under the completion cap and their decode time overlaps
+        if count_tokens(ocr_text) > _CHUNK_TOKENS:
+            chunks = split_paragraphs(ocr_text, _CHUNK_TOKENS)
+            corrected_chunks = await asyncio.gather(
+                *[_correct_chunk(c, system_prompt, temperature) for c in chunks]
+            )
+            corrected = "\n\n".join(corrected_chunks)
         else:
-            # Standard correction for minor errors
-            system_prompt = """You are an OCR error correction specialist. Fix common OCR errors in the text while preserving the original meaning and structure.
+            corrected = await _correct_chunk(ocr_text, system_prompt, temperature)
 
-Common OCR errors to fix:
+        if corrected:
+            _correction_cache.put(cache_key, corrected)
+            return corrected
+        return ocr_text
+        
+    except Exception as e:
+        print(f"[TextCorrection] Error: {e}")
+        # Return original text if correction fails
+        return ocr_text
+
+
+_SYSTEM_PROMPT_BATCH = """You are an OCR error correction specialist. You will receive a JSON object {"texts": [...]} containing texts extracted from book pages.
+
+For each text, fix common OCR errors:
 - Character substitutions: beart→heart, \\ollows→follows, rn→m, cl→d, etc.
 - Number/letter confusion: 1→I (when it should be "I"), 0→O, 5→S
 - Broken words: re ligion→religion, asso ciation→association
 - Missing spaces between sentences
-- Random symbols that don't make sense in context
 
 Rules:
 1. ONLY fix obvious OCR errors - don't rewrite or paraphrase
 2. Keep the exact same structure, paragraphs, and line breaks
 3. Preserve proper nouns and names as-is
 4. If unsure, keep the original
-5. Output ONLY the corrected text, nothing else"""
+5. Output ONLY a JSON object {"corrected": [...]} with the corrected texts in the SAME order and SAME length as the input"""
+
 
-        response = client.chat.completions.create(
+async def _correct_group(texts: List[str]) -> List[str]:
+    """Correct one packed group of texts with a single JSON completion"""
+    try:
+        response = await client.chat.completions.create(
             model="gpt-4o-mini",
             messages=[
-                {
-                    "role": "system",
-                    "content": system_prompt
-                },
-                {
-                    "role": "user",
-                    "content": f"Fix OCR errors in this text:\n\n{ocr_text}"
-                }
+                {"role": "system", "content": _SYSTEM_PROMPT_BATCH},
+                {"role": "user", "content": json.dumps({"texts": texts})}
             ],
-            temperature=0.2 if severely_garbled else 0.1,
-            max_tokens=4000
+            temperature=0.1,
+            max_tokens=4000,
+            response_format={"type": "json_object"}
         )
-        
-        corrected = response.choices[0].message.content.strip()
-        return corrected if corrected else ocr_text
-        
+
+        result = json.loads(response.choices[0].message.content)
+        corrected = result.get("corrected")
+
+        # Only trust the batch if it came back aligned with the input
+        if isinstance(corrected, list) and len(corrected) == len(texts):
+            return [c if isinstance(c, str) and c.strip() else orig
+                    for c, orig in zip(corrected, texts)]
+
+        print("[TextCorrection] Batch response misaligned, returning originals")
+        return texts
+
     except Exception as e:
-        print(f"[TextCorrection] Error: {e}")
-        # Return original text if correction fails
-        return ocr_text
+        print(f"[TextCorrection] Batch error: {e}")
+        # Return original texts if batched correction fails
+        return texts
+
+
+async def correct_ocr_text_batch(ocr_texts: List[str]) -> List[str]:
+    """
+    Correct OCR errors in multiple texts with as few API calls as the
+    token budget allows.
+
+    Texts are packed into contiguous groups of ~2000 input tokens; each
+    group costs one request (and one copy of the system prompt), and
+    groups run concurrently. A typical session of short pages still
+    completes in ~1 round-trip.
+
+    Args:
+        ocr_texts: List of raw OCR-extracted texts
+
+    Returns:
+        List of corrected texts, same order and length as the input.
+        Falls back to the originals for any group that fails.
+    """
+    if not ocr_texts:
+        return []
+
+    # Single page: the per-text path already handles garbled detection
+    if len(ocr_texts) == 1:
+        return [await correct_ocr_text(ocr_texts[0])]
+
+    # A text over the pack budget would become a lone JSON group whose
+    # reply truncates at the completion cap; route those through the
+    # chunked per-text path and pack only the rest
+    oversized = {i for i, t in enumerate(ocr_texts)
+                 if count_tokens(t) > _PACK_TOKENS}
+    if oversized:
+        packable = [t for i, t in enumerate(ocr_texts) if i not in oversized]
+        packed, singles = await asyncio.gather(
+            correct_ocr_text_batch(packable),
+            asyncio.gather(*[
+                correct_ocr_text(ocr_texts[i]) for i in sorted(oversized)
+            ])
+        )
+        packed_iter, singles_iter = iter(packed), iter(singles)
+        return [next(singles_iter) if i in oversized else next(packed_iter)
+                for i in range(len(ocr_texts))]
+
+    groups = pack_texts(ocr_texts, _PACK_TOKENS)
+    if len(groups) == 1:
+        return await _correct_group(groups[0])
+
+    results = await asyncio.gather(*[_correct_group(g) for g in groups])
+    return [text for group in results for text in group]
+
+
+async def correct_ocr_text_stream(ocr_text: str) -> AsyncIterator[str]:
+    """
+    Correct OCR errors, yielding text as OpenAI streams it.
+
+    The blocking path waits for the full ~seconds of decode before the
+    caller sees anything; streaming surfaces the first corrected words
+    immediately. Long inputs are corrected chunk by chunk in input
+    order, so each stays under the completion cap. The assembled result
+    warms the correction cache on completion.
+
+    Args:
+        ocr_text: Raw OCR-extracted text with potential errors
+
+    Yields:
+        Corrected text fragments in generation order
+    """
+    if not ocr_text or not ocr_text.strip():
+        return
+
+    # Too short to correct - pass through unchanged
+    if len(ocr_text.strip()) < 20:
+        yield ocr_text
+        return
+
+    severely_garbled, alpha_ratio = _quick_garbled_check(ocr_text)
+
+    # Almost no letters at all: skip the paid round-trip entirely
+    if severely_garbled and alpha_ratio < 0.3:
+        print("[TextCorrection] Input is mostly non-text, skipping correction")
+        yield "[unreadable text]"
+        return
+
+    system_prompt = _SYSTEM_PROMPT_GARBLED if severely_garbled else _SYSTEM_PROMPT_STANDARD
+    temperature = 0.2 if severely_garbled else 0.1
+
+    # Previously corrected text streams back as a single chunk
+    cache_key = llm_cache_key("gpt-4o-mini", system_prompt, ocr_text)
+    cached = _correction_cache.get(cache_key)
+    if cached is not None:
+        yield cached
+        return
+
+    chunks = (split_paragraphs(ocr_text, _CHUNK_TOKENS)
+              if count_tokens(ocr_text) > _CHUNK_TOKENS else [ocr_text])
+
+    parts = []
+    completed = False
+    try:
+        for i, chunk in enumerate(chunks):
+            if i:
+                parts.append("\n\n")
+                yield "\n\n"
+            response = await client.chat.completions.create(
+                model="gpt-4o-mini",
+                messages=[
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user", "content": f"Fix OCR errors in this text:\n\n{chunk}"}
+                ],
+                temperature=temperature,
+                max_tokens=_completion_cap(chunk),
+                stream=True
+            )
+            async for piece in response:
+                if piece.choices and piece.choices[0].delta.content:
+                    parts.append(piece.choices[0].delta.content)
+                    yield piece.choices[0].delta.content
+        completed = True
+    finally:
+        # Cache only complete corrections - a disconnect or stream
+        # error here would otherwise hand the blocking path truncations
+        if completed and parts:
+            _correction_cache.put(cache_key, "".join(parts).strip())
+
+
+async def correct_ocr_text_many(ocr_texts: List[str]) -> List[str]:
+    """
+    Correct many texts with one throttled request per text.
+
+    Unlike correct_ocr_text_batch (one JSON-packed prompt), each text
+    gets its own completion, so large jobs aren't limited by a single
+    4000-token response; the shared rate limiter keeps the fan-out
+    inside RPM/TPM quotas.
+
+    Args:
+        ocr_texts: Raw OCR-extracted texts
+
+    Returns:
+        Corrected texts in input order; originals on failure.
+    """
+    if not ocr_texts:
+        return []
+
+    try:
+        prompts = [f"Fix OCR errors in this text:\n\n{text}" for text in ocr_texts]
+        corrected = await process_many(prompts, _SYSTEM_PROMPT_STANDARD)
+        return [c.strip() if c and c.strip() else orig
+                for c, orig in zip(corrected, ocr_texts)]
+    except Exception as e:
+        print(f"[TextCorrection] Parallel error: {e}")
+        return ocr_texts
+
+
+async def submit_correction_batch(texts: List[str]) -> str:
+    """
+    Submit texts for offline correction via the OpenAI Batch API.
+
+    Meant for non-interactive backfills (e.g. a whole book): half the
+    cost of the regular path and no rate-limit pressure, with results
+    available within 24h via services.batch.poll_batch.
+
+    Args:
+        texts: Raw OCR-extracted texts
+
+    Returns:
+        The batch job id
+    """
+    bodies = [
+        {
+            "model": "gpt-4o-mini",
+            "messages": [
+                {"role": "system", "content": _SYSTEM_PROMPT_STANDARD},
+                {"role": "user", "content": f"Fix OCR errors in this text:\n\n{text}"}
+            ],
+            "temperature": 0.1,
+            "max_tokens": 4000
+        }
+        for text in texts
+    ]
+    return await submit_batch(bodies)
 
@@ -2,20 +2,76 @@
 Translation service using OpenAI API.
 Translates English text to Telugu while preserving proper nouns.
 """
-import os
-from pathlib import Path
-from openai import OpenAI
-from dotenv import load_dotenv
+import json
+import re
+import asyncio
+from typing import AsyncIterator, List
 
-# Load .env from backend directory
-env_path = Path(__file__).parent.parent / '.env'
-load_dotenv(dotenv_path=env_path, override=True)
+from .cache import LRUCache, llm_cache_key
+from .session import SESSION_TTL_SECONDS
+from .openai_client import client
+from .batch import submit_batch
+from .parallel import process_many, count_tokens, split_paragraphs, pack_texts
 
-# Initialize OpenAI client
-api_key = os.getenv("OPENAI_API_KEY")
-if not api_key or api_key == "your_openai_api_key_here":
-    print("[Translation] WARNING: OPENAI_API_KEY not set in .env file")
-client = OpenAI(api_key=api_key)
+# Inputs above this many tokens are translated as parallel paragraph
+# chunks so the response never hits the completion cap
+_CHUNK_TOKENS = 1500
+
+# Token budget per packed batch request - the system prompt is paid
+# once per group instead of once per text. Telugu output runs ~2.5x
+# the English input, so 1500 keeps a full group's response under the
+# 4000-token completion cap.
+_PACK_TOKENS = 1500
+
+# At least one three-letter run - anything less (digits, punctuation,
+# page numbers) has nothing to translate
+_HAS_ENGLISH_WORD = re.compile(r'[A-Za-z]{3}')
+
+# Memoize translations by content hash - identical inputs skip the API
+# call. Capped at the session TTL so translated page text never
+# outlives the session that produced it.
+_translation_cache = LRUCache(maxsize=256, ttl=SESSION_TTL_SECONDS)
+
+# Shared by the blocking and streaming translation paths
+_SYSTEM_PROMPT = """You are a professional English to Telugu translator.
+
+Rules:
+1. Translate the given English text to Telugu accurately
+2. DO NOT translate proper nouns (names of people, places, brands, titles)
+3. Keep proper nouns in their original English spelling
+4. Maintain the meaning and tone of the original text
+5. Use natural Telugu that flows well when read
+
+Example:
+English: "Harry Potter went to London to meet Hermione."
+Telugu: "Harry Potter London కి Hermione ని కలవడానికి వెళ్ళాడు."
+
+Only output the Telugu translation, nothing else."""
+
+
+def _completion_cap(text: str) -> int:
+    """
+    Completion cap sized to the input.
+
+    Telugu UTF-8 tokenizes to ~2-2.5x the English BPE count, so budget
+    2.5x plus slack; a tight cap shortens the decode slot OpenAI
+    schedules for the request instead of always reserving 4000 tokens.
+    """
+    return min(4000, int(count_tokens(text) * 2.5) + 128)
+
+
+async def _translate_chunk(chunk: str) -> str:
+    """Run one translation completion and return the stripped text"""
+    response = await client.chat.completions.create(
+        model="gpt-4o-mini",
+        messages=[
+            {"role": "system", "content": _SYSTEM_PROMPT},
+            {"role": "user", "content": chunk}
+        ],
+        temperature=0.3,  # Lower temperature for more consistent translations
+        max_tokens=_completion_cap(chunk)
+    )
+    return response.choices[0].message.content.strip()
 
 
 async def translate_to_telugu(english_text: str) -> str:
@@ -31,39 +87,216 @@ async def translate_to_telugu(english_text: str) -> str:
     """
     if not english_text.strip():
         return ""
-    
+
+    # Nothing translatable (pure digits/punctuation) - skip the call
+    if not _HAS_ENGLISH_WORD.search(english_text):
+        return english_text
+
+    # Return cached translation for previously seen text
+    cache_key = llm_cache_key("gpt-4o-mini", _SYSTEM_PROMPT, english_text)
+    cached = _translation_cache.get(cache_key)
+    if cached is not None:
+        return cached
+
     try:
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[
-                {
-                    "role": "system",
-                    "content": """You are a professional English to Telugu translator.
-                    
+        # Long pages are translated as parallel paragraph chunks: each
+        # stays under the completion cap and their decode time overlaps
+        if count_tokens(english_text) > _CHUNK_TOKENS:
+            chunks = split_paragraphs(english_text, _CHUNK_TOKENS)
+            telugu_text = "\n\n".join(
+                await asyncio.gather(*[_translate_chunk(c) for c in chunks])
+            )
+        else:
+            telugu_text = await _translate_chunk(english_text)
+
+        _translation_cache.put(cache_key, telugu_text)
+        return telugu_text
+
+    except Exception as e:
+        print(f"[Translation] Error: {e}")
+        raise Exception(f"Translation failed: {str(e)}")
+
+
+async def translate_to_telugu_stream(english_text: str) -> AsyncIterator[str]:
+    """
+    Translate English text to Telugu, yielding chunks as OpenAI streams
+    them so the first words reach the client in ~hundreds of ms instead
+    of after the full generation.
+
+    The assembled translation is written to the memo cache when the
+    stream completes, so later non-streaming calls still hit it.
+
+    Args:
+        english_text: Source text in English
+
+    Yields:
+        Telugu text fragments in generation order
+    """
+    if not english_text.strip():
+        return
+
+    # Nothing translatable (pure digits/punctuation) - skip the call
+    if not _HAS_ENGLISH_WORD.search(english_text):
+        yield english_text
+        return
+
+    # Previously translated text streams back as a single chunk
+    cache_key = llm_cache_key("gpt-4o-mini", _SYSTEM_PROMPT, english_text)
+    cached = _translation_cache.get(cache_key)
+    if cached is not None:
+        yield cached
+        return
+
+    response = await client.chat.completions.create(
+        model="gpt-4o-mini",
+        messages=[
+            {"role": "system", "content": _SYSTEM_PROMPT},
+            {"role": "user", "content": english_text}
+        ],
+        temperature=0.3,  # Lower temperature for more consistent translations
+        max_tokens=_completion_cap(english_text),
+        stream=True
+    )
+
+    parts = []
+    completed = False
+    try:
+        async for chunk in response:
+            if chunk.choices and chunk.choices[0].delta.content:
+                parts.append(chunk.choices[0].delta.content)
+                yield chunk.choices[0].delta.content
+        completed = True
+    finally:
+        # Cache only complete translations - a disconnect or stream
+        # error here would otherwise poison the cache with a truncation
+        if completed and parts:
+            _translation_cache.put(cache_key, "".join(parts).strip())
+
+
+_SYSTEM_PROMPT_BATCH = """You are a professional English to Telugu translator. You will receive a JSON object {"texts": [...]} of English strings.
+
 Rules:
-1. Translate the given English text to Telugu accurately
+1. Translate each string to Telugu accurately
 2. DO NOT translate proper nouns (names of people, places, brands, titles)
 3. Keep proper nouns in their original English spelling
-4. Maintain the meaning and tone of the original text
-5. Use natural Telugu that flows well when read
+4. Maintain the meaning and tone of each string
+5. Output ONLY a JSON object {"translations": [...]} with the Telugu strings in the SAME order and SAME length as the input"""
 
-Example:
-English: "Harry Potter went to London to meet Hermione."
-Telugu: "Harry Potter London కి Hermione ని కలవడానికి వెళ్ళాడు."
 
-Only output the Telugu translation, nothing else."""
-                },
-                {
-                    "role": "user",
-                    "content": english_text
-                }
-            ],
-            temperature=0.3,  # Lower temperature for more consistent translations
-            max_tokens=4000
+async def _translate_group(texts: List[str]) -> List[str]:
+    """Translate one packed group of texts with a single JSON completion"""
+    # Size the cap like _completion_cap, from the whole group's input
+    group_tokens = sum(count_tokens(t) for t in texts)
+    response = await client.chat.completions.create(
+        model="gpt-4o-mini",
+        messages=[
+            {"role": "system", "content": _SYSTEM_PROMPT_BATCH},
+            {"role": "user", "content": json.dumps({"texts": texts})}
+        ],
+        temperature=0.3,
+        max_tokens=min(4000, int(group_tokens * 2.5) + 128),
+        response_format={"type": "json_object"}
+    )
+
+    result = json.loads(response.choices[0].message.content)
+    translations = result.get("translations")
+
+    # Only trust the batch if it came back aligned with the input
+    if isinstance(translations, list) and len(translations) == len(texts):
+        return [t if isinstance(t, str) and t.strip() else orig
+                for t, orig in zip(translations, texts)]
+
+    print("[Translation] Batch response misaligned, returning originals")
+    return texts
+
+
+async def translate_batch_to_telugu(english_texts: List[str]) -> List[str]:
+    """
+    Translate multiple short English strings to Telugu in as few API
+    calls as the token budget allows.
+
+    Texts are packed into contiguous groups of ~2000 input tokens; each
+    group costs one request (and one copy of the system prompt), and
+    groups run concurrently. The character table usually fits in one.
+
+    Args:
+        english_texts: List of source strings in English
+
+    Returns:
+        List of Telugu translations, same order and length as the input.
+    """
+    if not english_texts:
+        return []
+
+    if len(english_texts) == 1:
+        return [await translate_to_telugu(english_texts[0])]
+
+    try:
+        groups = pack_texts(english_texts, _PACK_TOKENS)
+        if len(groups) == 1:
+            return await _translate_group(groups[0])
+
+        results = await asyncio.gather(*[_translate_group(g) for g in groups])
+        return [text for group in results for text in group]
+
+    except Exception as e:
+        print(f"[Translation] Batch error: {e}")
+        raise Exception(f"Batch translation failed: {str(e)}")
+
+
+async def translate_many_to_telugu(english_texts: List[str]) -> List[str]:
+    """
+    Translate many texts with one throttled request per text.
+
+    Unlike translate_batch_to_telugu (one JSON-packed prompt), each
+    text gets its own completion, so long pages aren't squeezed into a
+    single 4000-token response; the shared rate limiter keeps the
+    fan-out inside RPM/TPM quotas.
+
+    Args:
+        english_texts: Source texts in English
+
+    Returns:
+        Telugu translations in input order; originals on failure.
+    """
+    if not english_texts:
+        return []
+
+    try:
+        translations = await process_many(
+            english_texts, _SYSTEM_PROMPT, temperature=0.3
         )
-        
-        return response.choices[0].message.content.strip()
-        
+        return [t.strip() if t and t.strip() else orig
+                for t, orig in zip(translations, english_texts)]
     except Exception as e:
-        print(f"[Translation] Error: {e}")
-        raise Exception(f"Translation failed: {str(e)}")
+        print(f"[Translation] Parallel error: {e}")
+        return english_texts
+
+
+async def submit_translation_batch(english_texts: List[str]) -> str:
+    """
+    Submit texts for offline translation via the OpenAI Batch API.
+
+    Meant for non-interactive backfills: half the cost of the regular
+    path and no rate-limit pressure, with results available within 24h
+    via services.batch.poll_batch.
+
+    Args:
+        english_texts: Source texts in English
+
+    Returns:
+        The batch job id
+    """
+    bodies = [
+        {
+            "model": "gpt-4o-mini",
+            "messages": [
+                {"role": "system", "content": _SYSTEM_PROMPT},
+                {"role": "user", "content": text}
+            ],
+            "temperature": 0.3,
+            "max_tokens": 4000
+        }
+        for text in english_texts
+    ]
+    return await submit_batch(bodies)
@@ -2,9 +2,145 @@
 Text-to-Speech service using gTTS (Google Text-to-Speech).
 Generates English audio - audio is streamed, not saved permanently.
 """
+import asyncio
+import functools
+import hashlib
 import io
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import gtts.tts
 from gtts import gTTS
-from typing import Optional
+from typing import AsyncIterator, Iterator, Optional
+
+from .cache import LRUCache
+from .session import SESSION_TTL_SECONDS
+from .env import load_env, get_openai_api_key
+from .openai_client import client
+
+load_env()
+
+# OpenAI tts-1 streams MP3 frames as they are generated server-side
+# (~300ms to first audio); gTTS stays the default and the fallback
+# when no API key is configured.
+TTS_PROVIDER = os.getenv("TTS_PROVIDER", "gtts").lower()
+if TTS_PROVIDER == "openai" and not get_openai_api_key():
+    TTS_PROVIDER = "gtts"
+
+# gTTS opens a fresh requests.Session (new TCP+TLS handshake to
+# Google, 100-300ms) for every synthesis call. Route it through one
+# shared keep-alive session instead; the sentence-parallel workers all
+# draw from the same pool.
+_gtts_session = requests.Session()
+_gtts_session.mount('https://', HTTPAdapter(
+    pool_connections=4,
+    pool_maxsize=32,
+    max_retries=Retry(total=3, backoff_factor=0.3)
+))
+
+
+class _SharedSession:
+    """Context-manager shim handing gTTS the shared session without
+    letting its `with` block close it"""
+
+    def __enter__(self):
+        return _gtts_session
+
+    def __exit__(self, *exc):
+        return False
+
+
+class _RequestsShim:
+    """Module stand-in for gtts.tts: Session yields the shared pool,
+    everything else proxies to the real requests module"""
+
+    Session = _SharedSession
+
+    def __getattr__(self, name):
+        return getattr(requests, name)
+
+
+gtts.tts.requests = _RequestsShim()
+
+
+def warm_tts_session() -> None:
+    """
+    Open the TLS connection to Google ahead of the first synthesis.
+
+    Called from app startup (in a thread - it blocks on network) so the
+    first /tts request skips the handshake.
+    """
+    try:
+        _gtts_session.head("https://translate.google.com", timeout=3)
+    except Exception as e:
+        print(f"[TTS] Session warm-up failed: {e}")
+
+
+# Keep recently synthesized audio resident between calls - replaying a
+# page costs a dict lookup instead of a full synthesis round-trip.
+# Capped at the session TTL so spoken page audio never outlives the
+# session that produced it.
+_audio_cache = LRUCache(maxsize=64, ttl=SESSION_TTL_SECONDS)
+
+# Sentence boundaries for incremental synthesis
+_SENTENCE_SPLIT = re.compile(r'(?<=[.!?])\s+')
+
+# gTTS is a thin HTTP client; one GET per sentence, so concurrent
+# requests overlap their network latency
+_TTS_WORKERS = 8
+
+# Dedicated pool for whole-page synthesis calls so blocking gTTS work
+# never runs on the event loop. Kept separate from the per-call
+# sentence executors - sharing one pool for both levels could deadlock
+# when outer jobs saturate it and wait on queued inner ones.
+_POOL = ThreadPoolExecutor(max_workers=16)
+
+# Cap on synthesized text, cut at a sentence boundary
+_MAX_TTS_CHARS = 5000
+
+# Whitespace runs, collapsed in one C-level pass
+_WS = re.compile(r'\s+')
+
+
+def _truncate_at_sentence(text: str, limit: int = _MAX_TTS_CHARS) -> str:
+    """
+    Truncate long text at the last sentence boundary under the limit.
+
+    A mid-sentence character cut makes gTTS synthesize a fragment and
+    splits awkwardly against its own internal chunking; ending on
+    ./!/? keeps the audio clean.
+    """
+    if len(text) <= limit:
+        return text
+    head = text[:limit]
+    cut = max(head.rfind('.'), head.rfind('!'), head.rfind('?'))
+    if cut > 0:
+        return head[:cut + 1]
+    return head + "..."
+
+
+def _clean_text(text: str) -> str:
+    """
+    Collapse whitespace and cap length for synthesis.
+
+    The regex sub stays in C instead of allocating a word list the way
+    " ".join(text.split()) does; slicing first keeps the regex work
+    proportional to the cap, not the input.
+    """
+    if len(text) > 2 * _MAX_TTS_CHARS:
+        text = text[:2 * _MAX_TTS_CHARS]
+    return _truncate_at_sentence(_WS.sub(' ', text).strip())
+
+
+def _synth_one(sentence: str) -> bytes:
+    """Synthesize a single sentence to MP3 bytes"""
+    buf = io.BytesIO()
+    gTTS(text=sentence, lang='en', slow=False).write_to_fp(buf)
+    return buf.getvalue()
 
 
 def generate_speech(text: str) -> Optional[bytes]:
@@ -22,40 +158,164 @@ def generate_speech(text: str) -> Optional[bytes]:
     """
     if not text.strip():
         return None
-    
+
+    # Return cached audio for previously synthesized text
+    cache_key = hashlib.sha1(text.encode()).hexdigest()
+    cached = _audio_cache.get(cache_key)
+    if cached is not None:
+        return cached
+
     try:
-        # Clean text for TTS (remove excessive whitespace)
-        cleaned_text = " ".join(text.split())
-        
-        # Limit text length to prevent timeout
-        if len(cleaned_text) > 5000:
-            cleaned_text = cleaned_text[:5000] + "..."
+        # Clean text for TTS (collapse whitespace, cap at a sentence)
+        cleaned_text = _clean_text(text)
         
-        # Generate speech using gTTS
-        tts = gTTS(text=cleaned_text, lang='en', slow=False)
-        
-        # Save to bytes buffer (in-memory)
-        audio_buffer = io.BytesIO()
-        tts.write_to_fp(audio_buffer)
-        audio_buffer.seek(0)
-        
-        return audio_buffer.read()
+        # Synthesize sentences concurrently - each is an independent
+        # request, and MP3 frames concatenate cleanly
+        sentences = [s for s in _SENTENCE_SPLIT.split(cleaned_text) if s.strip()]
+        if len(sentences) > 1:
+            with ThreadPoolExecutor(max_workers=_TTS_WORKERS) as executor:
+                audio_bytes = b"".join(executor.map(_synth_one, sentences))
+        else:
+            audio_bytes = _synth_one(cleaned_text)
+
+        _audio_cache.put(cache_key, audio_bytes)
+        return audio_bytes
                 
     except Exception as e:
         print(f"[TTS] Error: {e}")
         return None
 
 
+async def generate_speech_async(text: str) -> Optional[bytes]:
+    """
+    Generate full speech audio without blocking the event loop.
+
+    generate_speech is synchronous network + MP3 encode and can run
+    for seconds; awaiting it through the TTS pool keeps other requests
+    flowing. Use this from async handlers that need complete bytes
+    rather than a stream.
+
+    Args:
+        text: English text to convert to speech
+
+    Returns:
+        MP3 audio bytes, or None if generation fails
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_POOL, generate_speech, text)
+
+
+def generate_speech_stream(text: str) -> Iterator[bytes]:
+    """
+    Generate English speech audio sentence by sentence.
+
+    Synthesizing the whole page before responding makes time-to-first-
+    byte equal to full synthesis time; yielding per-sentence MP3 chunks
+    (MP3 frames concatenate cleanly) lets playback start after roughly
+    one sentence instead. The assembled audio is written to the memo
+    cache when the stream completes.
+
+    Args:
+        text: English text to convert to speech
+
+    Yields:
+        MP3 audio chunks, one per sentence
+    """
+    if not text.strip():
+        return
+
+    # Previously synthesized text streams back as a single chunk
+    cache_key = hashlib.sha1(text.encode()).hexdigest()
+    cached = _audio_cache.get(cache_key)
+    if cached is not None:
+        yield cached
+        return
+
+    # Clean text for TTS (collapse whitespace, cap at a sentence)
+    cleaned_text = _clean_text(text)
+
+    parts = []
+    try:
+        for sentence in _SENTENCE_SPLIT.split(cleaned_text):
+            if not sentence.strip():
+                continue
+            chunk = _synth_one(sentence)
+            parts.append(chunk)
+            yield chunk
+    except Exception as e:
+        print(f"[TTS] Stream error: {e}")
+        return
+    # Cache only when every sentence synthesized - a stopped playback
+    # or error would otherwise replay truncated audio from the cache
+    if parts:
+        _audio_cache.put(cache_key, b"".join(parts))
+
+
+async def generate_speech_openai_stream(text: str) -> AsyncIterator[bytes]:
+    """
+    Generate English speech with OpenAI tts-1, yielding MP3 chunks as
+    the API streams them.
+
+    Selected when TTS_PROVIDER=openai; the first audio frame arrives in
+    a few hundred ms instead of after per-sentence gTTS round-trips.
+    The assembled audio is written to the memo cache on completion.
+
+    Args:
+        text: English text to convert to speech
+
+    Yields:
+        MP3 audio chunks in generation order
+    """
+    if not text.strip():
+        return
+
+    # Previously synthesized text streams back as a single chunk
+    cache_key = hashlib.sha1(text.encode()).hexdigest()
+    cached = _audio_cache.get(cache_key)
+    if cached is not None:
+        yield cached
+        return
+
+    # Clean text for TTS (collapse whitespace, cap at a sentence)
+    cleaned_text = _clean_text(text)
+
+    parts = []
+    try:
+        async with client.audio.speech.with_streaming_response.create(
+            model="tts-1",
+            voice="alloy",
+            input=cleaned_text,
+            response_format="mp3"
+        ) as response:
+            async for chunk in response.iter_bytes(1024):
+                parts.append(chunk)
+                yield chunk
+    except Exception as e:
+        print(f"[TTS] OpenAI stream error: {e}")
+        return
+    # Cache only when the stream ran to the end - a stopped playback
+    # or error would otherwise replay truncated audio from the cache
+    if parts:
+        _audio_cache.put(cache_key, b"".join(parts))
+
+
+# Average speaking rate is ~150 words per minute
+_WORDS_PER_SEC = 150 / 60
+
+
+@functools.lru_cache(maxsize=128)
 def get_audio_duration_estimate(text: str) -> float:
     """
     Estimate audio duration based on text length.
-    Average speaking rate is ~150 words per minute.
-    
+
+    Polled repeatedly for UI progress bars, so words are counted with a
+    C-level space count (close enough for an estimate - no list of word
+    strings allocated) and results are memoized per text.
+
     Args:
         text: Input text
-    
+
     Returns:
         Estimated duration in seconds
     """
-    words = len(text.split())
-    return (words / 150) * 60  # Convert to seconds
+    return (text.count(' ') + 1) / _WORDS_PER_SEC